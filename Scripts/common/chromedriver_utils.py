@@ -0,0 +1,37 @@
+"""
+Shared ChromeDriver resolution for Selenium-based scrapers.
+Resolves the driver binary once per process so webdriver-manager's version check runs at most once.
+"""
+import os
+import shutil
+import logging
+import threading
+from typing import Optional
+
+_chromedriver_path: Optional[str] = None
+_lock = threading.Lock()
+
+def get_chromedriver_path() -> str:
+    """
+    Get the ChromeDriver binary path, resolving it on first use.
+
+    Resolution order:
+        1. CHROMEDRIVER environment variable
+        2. System `chromedriver` on PATH when running under CI
+        3. webdriver-manager download/cache
+
+    Returns:
+        Path to the ChromeDriver executable
+    """
+    global _chromedriver_path
+    with _lock:
+        if _chromedriver_path is None:
+            path = os.environ.get('CHROMEDRIVER')
+            if not path and os.environ.get('CI'):
+                path = shutil.which('chromedriver')
+            if not path:
+                from webdriver_manager.chrome import ChromeDriverManager
+                path = ChromeDriverManager().install()
+            logging.info(f"Using ChromeDriver at {path}")
+            _chromedriver_path = path
+        return _chromedriver_path
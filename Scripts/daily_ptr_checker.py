@@ -5,50 +5,81 @@ Steps:
 1) Scrape House Financial Disclosure site for PTR filings for a given year
 2) Compare against existing `Filings.doc_id` in Supabase to find new filings
 3) For each new filing, process the PDF and extract transactions (LLM-backed)
-4) Store members, assets, filings, and transactions into Supabase
+4) Store members, assets, filings, and transactions into Supabase, flushing in chunks as they are extracted
 
 Usage:
   python daily_ptr_checker.py --year 2025 --limit 5 --headless true
 
 Environment:
   Reads credentials from Scripts/.env via submodules
+  PTR_CONCURRENCY: number of filings processed in parallel (default 8)
+  PTR_LLM_RPM: max LLM requests started per minute, shared by the House and Senate pipelines (default 300)
+  SENATE_DRIVER_POOL: number of Chrome sessions used for Senate page extraction (default 4)
+  CHROMEDRIVER: optional path to a chromedriver binary (skips webdriver-manager)
 """
 
 import os
 import sys
 import json
+import sqlite3
+import time
 import logging
+import queue
+import asyncio
+import threading
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Tuple
+from types import SimpleNamespace
+from typing import Callable, List, Dict, Optional, Tuple
 
-# Senate integration imports
+# Senate integration lives in its own script folder and is imported lazily (see _lazy_senate_imports)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SENATE_DIR = os.path.join(SCRIPT_DIR, 'Senate Script')
-if SENATE_DIR not in sys.path:
-    sys.path.insert(0, SENATE_DIR)
 
+# orjson is optional; stdlib json is the fallback
 try:
-    import combined_scraper as senate_scraper
-    import scanToTextLLM as senate_llm
-    from combined_scraper import verify_session, extract_text_from_page, determine_document_type
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options as ChromeOptions
-    from selenium.webdriver.chrome.service import Service as ChromeService
-    from webdriver_manager.chrome import ChromeDriverManager
-except Exception:
-    senate_scraper = None
-    senate_llm = None
+	import orjson
+except ImportError:
+	orjson = None
 
 # Local imports
-from house_ptr_scraper import HouseDisclosureScraper
-from ptr_pdf_processor import process_ptr_pdf
+from common import db_schema
+from common.chromedriver_utils import get_chromedriver_path
+from ptr_pdf_processor import process_ptr_pdf_batch, BATCH_SIZE
+from llm_batch import run_llm_batch, call_with_backoff, call_tracking_failures, track_request_failures, LLMUnavailableError, ThreadRateLimiter
 from supabase_db_processor import SupabaseDBProcessor
 
 # Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Rows per bulk DB request when persisting transactions
+UPSERT_CHUNK_SIZE = 500
+
+# Max seconds extracted transactions wait before a partial chunk is flushed
+FLUSH_INTERVAL_SECONDS = 10
+
+# Scraped House filings buffered between the scrape producer and LLM consumers
+HOUSE_QUEUE_SIZE = 64
+
+# Local record of Senate filings already persisted, used by the Senate scraper's own dedup
+SENATE_CACHE_DB = os.path.join(SCRIPT_DIR, 'senate_cache.sqlite')
+
+# Module names defined by both 'HOR Script' and 'Senate Script'
+SENATE_SHADOWED_MODULES = ('scanToTextLLM', 'rate_limiter')
+
+# Cached result of _lazy_senate_imports (False once an import attempt has failed)
+_SENATE = None
+_SENATE_LOCK = threading.Lock()
+
+
+def dumps_pretty(obj) -> str:
+	"""Serialize to indented JSON, using orjson when available."""
+	if orjson is not None:
+		return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+	return json.dumps(obj, indent=2)
+
 
 def build_arg_parser() -> argparse.ArgumentParser:
 	parser = argparse.ArgumentParser(description="Run the daily PTR pipeline (House + Senate)")
@@ -63,28 +94,60 @@ def build_arg_parser() -> argparse.ArgumentParser:
 	return parser
 
 
-def scrape_ptrs(year: int, headless: bool, max_pages: int) -> List[Dict]:
-	logger.info(f"Starting scrape for year={year}, headless={headless}, max_pages={'ALL' if max_pages <= 0 else max_pages}")
-	scraper = HouseDisclosureScraper(headless=headless)
-	filings = scraper.scrape_ptr_filings(
-		year=year,
-		max_pages=None if max_pages <= 0 else max_pages,
-		find_first_ptr=False,
-	)
-	if filings:
-		logger.info(f"Scrape complete: {len(filings)} filings found")
-	else:
-		logger.warning("Scrape returned no filings")
-	return filings
+def _lazy_senate_imports() -> Optional[SimpleNamespace]:
+	"""
+	Import the Senate scraper, its LLM helpers, and Selenium on first use.
+
+	House-only runs never pay for these imports. The HOR and Senate folders share module names,
+	and ptr_pdf_processor has already loaded the HOR ones, so those are moved out of sys.modules
+	while the Senate modules import and put back afterwards.
+
+	Returns:
+		Namespace of Senate helpers, or None if they cannot be imported
+	"""
+	global _SENATE
+	with _SENATE_LOCK:
+		if _SENATE is None:
+			shadowed = {name: sys.modules.pop(name) for name in SENATE_SHADOWED_MODULES if name in sys.modules}
+			sys.path.insert(0, SENATE_DIR)
+			try:
+				import combined_scraper
+				import scanToTextLLM as senate_llm
+				senate_llm.rate_limited_api_call = track_request_failures(senate_llm.rate_limited_api_call)
+				from selenium import webdriver
+				from selenium.webdriver.chrome.options import Options as ChromeOptions
+				from selenium.webdriver.chrome.service import Service as ChromeService
+				_SENATE = SimpleNamespace(
+					scraper=combined_scraper,
+					llm=senate_llm,
+					verify_session=combined_scraper.verify_session,
+					extract_text_from_page=combined_scraper.extract_text_from_page,
+					webdriver=webdriver,
+					ChromeOptions=ChromeOptions,
+					ChromeService=ChromeService,
+				)
+			except Exception as e:
+				logger.warning(f"Senate helpers could not be imported: {e}")
+				_SENATE = False
+			finally:
+				sys.path.remove(SENATE_DIR)
+				sys.modules.update(shadowed)
+		return _SENATE or None
 
 
 def senate_scrape_links(max_pages: int) -> List[Tuple[str, str, str]]:
 	"""Scrape Senate PTR links using existing Senate scraper, returning (doc_id, url, member_name) tuples."""
-	if senate_scraper is None:
+	senate = _lazy_senate_imports()
+	if senate is None:
 		logger.warning("Senate scraper not available; skipping Senate scrape")
 		return []
 	try:
-		links = senate_scraper.scrape_all_ptr_links(force_rescrape=False, db_path=":memory:")
+		conn = sqlite3.connect(SENATE_CACHE_DB)
+		try:
+			db_schema.create_tables(conn)
+		finally:
+			conn.close()
+		links = senate.scraper.scrape_all_ptr_links(force_rescrape=False, db_path=SENATE_CACHE_DB)
 		# Normalize
 		normalized: List[Tuple[str, str, str]] = []
 		for item in links:
@@ -98,114 +161,401 @@ def senate_scrape_links(max_pages: int) -> List[Tuple[str, str, str]]:
 		return []
 
 
-def senate_links_to_transactions(links: List[Tuple[str, str, str]], headless: bool, max_count: int) -> List[Dict]:
-	"""Process Senate links by extracting text with Selenium and parsing via LLM."""
-	if senate_llm is None or verify_session is None or extract_text_from_page is None:
-		logger.warning("Senate helpers not available; skipping Senate processing")
-		return []
-	transactions: List[Dict] = []
-	# Setup headless Chrome
-	chrome_options = ChromeOptions()
-	if headless:
-		chrome_options.add_argument("--headless=new")
-	chrome_options.add_argument("--no-sandbox")
-	chrome_options.add_argument("--disable-dev-shm-usage")
-	chrome_options.add_argument("--disable-gpu")
-	chrome_options.add_argument("--window-size=1920,1080")
-	service = ChromeService(ChromeDriverManager().install())
-	driver = webdriver.Chrome(service=service, options=chrome_options)
-	try:
-		# Verify session once
-		verify_session(driver, 'https://efdsearch.senate.gov/search/')
-		count = 0
-		for doc_id, url, member_name in links:
-			if not doc_id or not url:
-				continue
-			if 0 < max_count <= count:
-				break
-			count += 1
+class DriverPool:
+	"""Fixed set of verified Chrome sessions shared across worker threads."""
+
+	def __init__(self, size: int, headless: bool):
+		senate = _lazy_senate_imports()
+		self._drivers: List = []
+		self._queue: queue.Queue = queue.Queue()
+		chrome_options = senate.ChromeOptions()
+		if headless:
+			chrome_options.add_argument("--headless=new")
+		chrome_options.add_argument("--no-sandbox")
+		chrome_options.add_argument("--disable-dev-shm-usage")
+		chrome_options.add_argument("--disable-gpu")
+		chrome_options.add_argument("--window-size=1920,1080")
+		try:
+			# Initialized serially: verify_session writes a shared cookies file
+			for _ in range(max(1, size)):
+				# Each driver needs its own Service: a Service binds one chromedriver port
+				service = senate.ChromeService(get_chromedriver_path())
+				driver = senate.webdriver.Chrome(service=service, options=chrome_options)
+				self._drivers.append(driver)
+				senate.verify_session(driver, 'https://efdsearch.senate.gov/search/')
+				self._queue.put(driver)
+		except Exception:
+			self.close()
+			raise
+		logger.info(f"Senate driver pool ready with {len(self._drivers)} Chrome session(s)")
+
+	def get(self):
+		return self._queue.get()
+
+	def put(self, driver) -> None:
+		self._queue.put(driver)
+
+	def close(self) -> None:
+		for driver in self._drivers:
 			try:
-				driver.get(url)
-				text = extract_text_from_page(driver, doc_id)
-				if not text.strip():
-					logger.info(f"Senate {doc_id}: no text extracted")
-					continue
-				csv_text = senate_llm.call_llm_api_with_text(text, {'DocID': doc_id, 'Name': member_name, 'URL': url})
-				parsed = senate_llm.parse_llm_transactions(csv_text or '', {'DocID': doc_id})
-				for t in parsed:
-					transactions.append({
-						'doc_id': doc_id,
-						'member_name': member_name,
-						'office': 'Senate',
-						'pdf_url': url,
-						'ticker': t.get('ticker'),
-						'asset_name': t.get('company_name'),
-						'transaction_type': t.get('transaction_type_full'),
-						'transaction_date': t.get('transaction_date_str'),
-						'amount_low': t.get('amount_low'),
-						'amount_high': t.get('amount_high'),
-						'owner': t.get('owner_code'),
-						'comment': t.get('raw_llm_line', '')
-					})
-				logger.info(f"Senate {doc_id}: extracted {len(parsed)} transaction(s)")
+				driver.quit()
 			except Exception as e:
-				logger.error(f"Senate {doc_id}: processing failed: {e}")
-				continue
+				logger.warning(f"Error closing Chrome driver: {e}")
+		self._drivers = []
+
+
+def record_senate_doc_ids(transactions: List[Dict]) -> None:
+	"""Record persisted Senate filings in the local cache DB so later scrapes skip them."""
+	filings = {t['doc_id']: t for t in transactions if t.get('office') == 'Senate' and t.get('doc_id')}
+	if not filings:
+		return
+	conn = sqlite3.connect(SENATE_CACHE_DB)
+	try:
+		db_schema.create_tables(conn)
+		cursor = conn.cursor()
+		for doc_id, t in filings.items():
+			member_id = db_schema.get_or_create_member(cursor, t.get('member_name') or 'Unknown Member')
+			cursor.execute(
+				"INSERT OR IGNORE INTO Filings (member_id, doc_id, url) VALUES (?, ?, ?)",
+				(member_id, doc_id, t.get('pdf_url') or ''),
+			)
+		conn.commit()
+		logger.info(f"Recorded {len(filings)} Senate filing(s) in {SENATE_CACHE_DB}")
+	except sqlite3.Error as e:
+		logger.error(f"Failed to record Senate filings in cache DB: {e}")
 	finally:
-		driver.quit()
-	return transactions
+		conn.close()
 
 
-def filter_new_filings(filings: List[Dict], existing_doc_ids: set, limit: int) -> List[Dict]:
-	new_filings: List[Dict] = []
-	for f in filings:
-		doc_id = f.get("doc_id")
-		if not doc_id:
-			continue
-		if doc_id not in existing_doc_ids:
-			new_filings.append(f)
-			if 0 < limit <= len(new_filings):
-				break
-	logger.info(f"Filtered new filings: {len(new_filings)} (from {len(filings)} total scraped)")
-	return new_filings
+def senate_links_to_transactions(links: List[Tuple[str, str, str]], headless: bool,
+		emit: Callable[[Dict], None], limiter: ThreadRateLimiter) -> int:
+	"""
+	Process Senate links by extracting text with a pool of Selenium sessions and parsing via LLM.
+
+	Each filing's transactions are passed to `emit` as soon as its LLM answer is parsed; returns the number emitted.
+	"""
+	senate = _lazy_senate_imports()
+	if senate is None:
+		logger.warning("Senate helpers not available; skipping Senate processing")
+		return 0
+	links = [(d, u, m) for (d, u, m) in links if d and u]
+	if not links:
+		return 0
+
+	# Phase 1: extract page text across the driver pool
+	pool_size = min(_env_int('SENATE_DRIVER_POOL', 4), len(links))
+	pool = DriverPool(pool_size, headless)
+
+	def _fetch(link: Tuple[str, str, str]) -> str:
+		doc_id, url, _ = link
+		driver = pool.get()
+		try:
+			driver.get(url)
+			return senate.extract_text_from_page(driver, doc_id)
+		finally:
+			pool.put(driver)
+
+	extracted: List[Tuple[str, str, str, str]] = []
+	try:
+		with ThreadPoolExecutor(max_workers=pool_size) as executor:
+			futures = [executor.submit(_fetch, link) for link in links]
+			for (doc_id, url, member_name), future in zip(links, futures):
+				try:
+					text = future.result()
+					if not text.strip():
+						logger.info(f"Senate {doc_id}: no text extracted")
+						continue
+					extracted.append((doc_id, url, member_name, text))
+				except Exception as e:
+					logger.error(f"Senate {doc_id}: text extraction failed: {e}")
+	finally:
+		pool.close()
+
+	# Phase 2: dispatch all LLM calls concurrently under the rate limit, emitting each filing's rows as its answer arrives
+	def _call_llm(item: Tuple[str, str, str, str]) -> int:
+		doc_id, url, member_name, text = item
+		limiter.acquire()
+		csv_text, request_failed = call_tracking_failures(
+			senate.llm.call_llm_api_with_text, text, {'DocID': doc_id, 'Name': member_name, 'URL': url}
+		)
+		if request_failed:
+			# The helper reports HTTP/network failures as DOCUMENT_UNREADABLE; raise so the batch backs off.
+			# A model-issued DOCUMENT_UNREADABLE is a final answer and simply parses to no rows.
+			raise LLMUnavailableError(f"Senate {doc_id}: LLM request failed")
+		try:
+			parsed = senate.llm.parse_llm_transactions(csv_text or '', {'DocID': doc_id})
+			parsed_rows = [
+				{
+					'doc_id': doc_id,
+					'member_name': member_name,
+					'office': 'Senate',
+					'pdf_url': url,
+					'ticker': t.get('ticker'),
+					'asset_name': t.get('company_name'),
+					'transaction_type': t.get('transaction_type_full'),
+					'transaction_date': t.get('transaction_date_str'),
+					'amount_low': t.get('amount_low'),
+					'amount_high': t.get('amount_high'),
+					'owner': t.get('owner_code'),
+					'comment': t.get('raw_llm_line', '')
+				}
+				for t in parsed
+			]
+		except Exception as e:
+			logger.error(f"Senate {doc_id}: processing failed: {e}")
+			return 0
+		for row in parsed_rows:
+			emit(row)
+		logger.info(f"Senate {doc_id}: extracted {len(parsed_rows)} transaction(s)")
+		return len(parsed_rows)
 
+	counts = asyncio.run(run_llm_batch(extracted, _call_llm, rpm=None, concurrency=get_ptr_concurrency()))
+	return sum(count for count in counts if count)
 
-def process_filings_to_transactions(new_filings: List[Dict]) -> List[Dict]:
-	"""Process each filing PDF, returning flattened transaction records with filing metadata."""
+
+def _env_int(name: str, default: int) -> int:
+	try:
+		return max(1, int(os.environ.get(name, default)))
+	except ValueError:
+		logger.warning(f"Invalid {name} value; defaulting to {default}")
+		return default
+
+
+def get_ptr_concurrency() -> int:
+	"""Max LLM-backed calls in flight; tune PTR_CONCURRENCY to the LLM provider RPM limit."""
+	return _env_int('PTR_CONCURRENCY', 8)
+
+
+def get_llm_rpm() -> int:
+	"""Requests-per-minute cap for LLM calls (OpenRouter allows 50 per 10s)."""
+	return _env_int('PTR_LLM_RPM', 300)
+
+
+def _augment_group_transactions(group: List[Dict], group_results: Dict[str, Dict]) -> List[Dict]:
+	"""Flatten per-filing results for a group, attaching the filing metadata expected by the DB processor."""
 	all_transactions: List[Dict] = []
-	for idx, filing in enumerate(new_filings, start=1):
+	for filing in group:
 		doc_id = filing.get("doc_id")
 		pdf_url = filing.get("pdf_url")
 		member_name = filing.get("member_name")
 		office = filing.get("office")
-		logger.info(f"[{idx}/{len(new_filings)}] Processing filing doc_id={doc_id} member={member_name}")
+		processed = (group_results or {}).get(doc_id)
+		if processed is None:
+			logger.error(f"Failed processing doc_id={doc_id}")
+			continue
+		transactions = processed.get("transactions", [])
+		# Augment transactions with filing metadata expected by DB processor
+		meta = {"doc_id": doc_id, "member_name": member_name, "office": office, "pdf_url": pdf_url}
+		all_transactions.extend({**t, **meta} for t in transactions)
+		logger.info(f"doc_id={doc_id} member={member_name}: extracted {len(transactions)} transaction(s)")
+	return all_transactions
+
+
+def _process_filing_group(group: List[Dict], limiter: ThreadRateLimiter) -> Dict[str, Dict]:
+	"""
+	Process one group of filings, raising LLMUnavailableError if any filing's LLM request failed.
+
+	Filings that succeeded are cached, so a retry only rescans the failed ones; if retries run
+	out, the error's partial result keeps the successful filings.
+	"""
+	results = process_ptr_pdf_batch([(f.get("pdf_url"), f.get("doc_id")) for f in group], limiter)
+	failed = [doc_id for doc_id, processed in results.items() if processed.get("llm_failed")]
+	if failed:
+		raise LLMUnavailableError(f"LLM request failed for {', '.join(failed)}", partial=results)
+	return results
+
+
+def preview_transactions(transactions: List[Dict]) -> Dict:
+	"""Dry-run stand-in for persistence: log the first transaction and return a summary."""
+	logger.info("Dry-run enabled: skipping DB writes. Preview of first transaction (if any):")
+	if transactions:
+		logger.info(dumps_pretty(transactions[0]))
+	return {"dry_run": True, "transactions": len(transactions)}
+
+
+class TxnFlusher:
+	"""
+	Background writer that upserts transactions to Supabase while the pipelines are still running.
+
+	Rows handed to `add` are buffered on a queue and written with `upsert_bulk` whenever
+	`chunk_size` rows have accumulated or `interval` seconds have passed, so a crash mid-run
+	only loses the rows not yet flushed. Senate filings are recorded in the local cache DB
+	once their rows have been inserted.
+	"""
+
+	_STOP = object()
+
+	def __init__(self, db: SupabaseDBProcessor, chunk_size: int = UPSERT_CHUNK_SIZE,
+			interval: float = FLUSH_INTERVAL_SECONDS):
+		self.db = db
+		self.chunk_size = chunk_size
+		self.interval = interval
+		self.stats: Dict[str, int] = {}
+		self.count = 0
+		self._queue: queue.Queue = queue.Queue()
+		self._thread = threading.Thread(target=self._run, name="txn-flusher", daemon=True)
+		self._thread.start()
+
+	def add(self, tx: Dict) -> None:
+		"""Queue one transaction record for persistence."""
+		self._queue.put(tx)
+
+	def close(self) -> Dict:
+		"""Flush any remaining rows, stop the writer thread, and return aggregated upsert stats."""
+		self._queue.put(self._STOP)
+		self._thread.join()
+		return self.stats
+
+	def _run(self) -> None:
+		buffer: List[Dict] = []
+		deadline = time.monotonic() + self.interval
+		while True:
+			stop = False
+			try:
+				tx = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+				if tx is self._STOP:
+					stop = True
+				else:
+					buffer.append(tx)
+			except queue.Empty:
+				pass
+			if stop or len(buffer) >= self.chunk_size or time.monotonic() >= deadline:
+				if buffer:
+					self._flush(buffer)
+					buffer = []
+				deadline = time.monotonic() + self.interval
+			if stop:
+				return
+
+	def _flush(self, chunk: List[Dict]) -> None:
 		try:
-			processed = process_ptr_pdf(pdf_url, doc_id) or {}
-			transactions = processed.get("transactions", [])
-			for t in transactions:
-				# Augment transaction with filing metadata expected by DB processor
-				tx = dict(t)
-				tx["doc_id"] = doc_id
-				tx["member_name"] = member_name
-				tx["office"] = office
-				tx["pdf_url"] = pdf_url
-				all_transactions.append(tx)
-			logger.info(f"doc_id={doc_id}: extracted {len(transactions)} transaction(s)")
+			persisted = set()
+			chunk_stats = self.db.upsert_bulk(chunk, persisted_doc_ids=persisted)
+			for key, value in chunk_stats.items():
+				self.stats[key] = self.stats.get(key, 0) + value
+			self.count += len(chunk)
+			# upsert_bulk reports failures in its stats rather than raising; only cache filings that landed
+			record_senate_doc_ids([tx for tx in chunk if tx.get('doc_id') in persisted])
+			logger.info(f"Flushed {len(chunk)} transaction(s) to Supabase ({self.count} so far)")
 		except Exception as e:
-			logger.error(f"Failed processing doc_id={doc_id}: {e}")
-	return all_transactions
+			logger.error(f"Failed to flush {len(chunk)} transaction(s): {e}")
+
+
+class FilingBudget:
+	"""Thread-safe cap on filings processed per run, shared by the House and Senate pipelines (0 = unlimited)."""
+
+	def __init__(self, limit: int):
+		self.unlimited = limit <= 0
+		self.remaining = max(0, limit)
+		self._lock = threading.Lock()
+
+	def claim(self, requested: int) -> int:
+		"""Reserve up to `requested` filings, returning how many were granted."""
+		if self.unlimited:
+			return requested
+		with self._lock:
+			granted = min(requested, self.remaining)
+			self.remaining -= granted
+			return granted
+
+
+def run_house(year: int, headless: bool, max_pages: int, existing_doc_ids: set, budget: FilingBudget,
+		house_claimed: threading.Event, save_scrape_json: bool, emit: Callable[[Dict], None],
+		limiter: ThreadRateLimiter) -> int:
+	"""
+	Scrape House filings and process them while scraping continues.
+
+	The scrape is the producer: each new filing claims budget and goes on a bounded queue, so LLM
+	consumers start on page 1 while later pages load. `house_claimed` is set once the scrape ends,
+	i.e. when House has reserved all of its share of the budget. `limiter` is acquired before every
+	LLM request. Extracted transactions are passed to `emit` group by group; returns the number emitted.
+	"""
+	filing_queue: queue.Queue = queue.Queue(maxsize=HOUSE_QUEUE_SIZE)
+	emitted = 0
+	lock = threading.Lock()
+	workers = get_ptr_concurrency()
+
+	def _consume() -> None:
+		nonlocal emitted
+		done = False
+		while not done:
+			filing = filing_queue.get()
+			if filing is None:
+				return
+			# Drain whatever is already waiting (up to BATCH_SIZE) into one row-marshaled request
+			group = [filing]
+			while len(group) < BATCH_SIZE:
+				try:
+					queued_filing = filing_queue.get_nowait()
+				except queue.Empty:
+					break
+				if queued_filing is None:
+					done = True
+					break
+				group.append(queued_filing)
+			try:
+				label = ",".join(str(f.get("doc_id")) for f in group)
+				transactions = _augment_group_transactions(group, call_with_backoff(lambda g: _process_filing_group(g, limiter), group, label))
+				for tx in transactions:
+					emit(tx)
+				with lock:
+					emitted += len(transactions)
+			except Exception as e:
+				logger.error(f"House consumer failed on group: {e}")
+
+	scraped: List[Dict] = []
+	queued_ids = set()
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		consumers = [executor.submit(_consume) for _ in range(workers)]
+		try:
+			logger.info(f"Starting scrape for year={year}, headless={headless}, max_pages={'ALL' if max_pages <= 0 else max_pages}")
+			# Imported here: house_ptr_scraper pulls in Selenium at module level
+			from house_ptr_scraper import HouseDisclosureScraper
+			scraper = HouseDisclosureScraper(headless=headless)
+			for filing in scraper.iter_ptr_filings(year=year, max_pages=None if max_pages <= 0 else max_pages):
+				scraped.append(filing)
+				doc_id = filing.get("doc_id")
+				if not doc_id or doc_id in existing_doc_ids or doc_id in queued_ids:
+					continue
+				if not budget.claim(1):
+					logger.info("Filing budget exhausted; stopping House scrape")
+					break
+				queued_ids.add(doc_id)
+				filing_queue.put(filing)
+		finally:
+			house_claimed.set()
+			for _ in consumers:
+				filing_queue.put(None)
+		logger.info(f"Scrape complete: {len(scraped)} filings found, {len(queued_ids)} new")
+
+		if save_scrape_json:
+			out_path = os.path.join(os.path.dirname(__file__), f"house_scraped_filings_{year}.json")
+			payload = {"year": year, "filings": scraped, "scraped_at": datetime.now().isoformat()}
+			if orjson is not None:
+				with open(out_path, "wb") as f:
+					f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+			else:
+				with open(out_path, "w") as f:
+					json.dump(payload, f, indent=2)
+			logger.info(f"Saved scraped filings JSON to {out_path}")
 
+	if not queued_ids:
+		logger.info("No new House filings to process.")
+	return emitted
 
-def persist_transactions(transactions: List[Dict], dry_run: bool) -> Dict:
-	if dry_run:
-		logger.info("Dry-run enabled: skipping DB writes. Preview of first transaction (if any):")
-		if transactions:
-			logger.info(json.dumps(transactions[0], indent=2))
-		return {"dry_run": True, "transactions": len(transactions)}
 
-	db = SupabaseDBProcessor()
-	stats = db.process_transactions_batch(transactions)
-	return stats
+def run_senate(headless: bool, max_pages: int, existing_doc_ids: set, budget: FilingBudget,
+		house_claimed: threading.Event, emit: Callable[[Dict], None], limiter: ThreadRateLimiter) -> int:
+	"""Scrape and process Senate filings with whatever budget House leaves over."""
+	s_links = senate_scrape_links(max_pages=max_pages)
+	s_links = [t for t in s_links if t[0] and t[0] not in existing_doc_ids]
+	# House keeps priority on the filing budget; wait for its claim before taking ours
+	house_claimed.wait()
+	s_links = s_links[:budget.claim(len(s_links))]
+	if not s_links:
+		logger.info("No new Senate links to process.")
+		return 0
+	return senate_links_to_transactions(s_links, headless=headless, emit=emit, limiter=limiter)
 
 
 def main():
@@ -218,21 +568,9 @@ def main():
 	max_pages = int(args.max_pages)
 	dry_run = args.dry_run
 	include_house = args.house.lower() == 'true'
-	include_senate = args.senate.lower() == 'true'
-
-	all_transactions: List[Dict] = []
+	include_senate = args.senate.lower() == 'true' and _lazy_senate_imports() is not None
 
-	# 1) Scrape House (optional)
-	filings: List[Dict] = []
-	if include_house:
-		filings = scrape_ptrs(year=year, headless=headless, max_pages=max_pages)
-		if args.save_scrape_json:
-			out_path = os.path.join(os.path.dirname(__file__), f"house_scraped_filings_{year}.json")
-			with open(out_path, "w") as f:
-				json.dump({"year": year, "filings": filings, "scraped_at": datetime.now().isoformat()}, f, indent=2)
-			logger.info(f"Saved scraped filings JSON to {out_path}")
-
-	# 2) Fetch existing doc_ids
+	# 1) Fetch existing doc_ids
 	try:
 		db = SupabaseDBProcessor()
 		existing_doc_ids = db.get_existing_doc_ids()
@@ -240,35 +578,43 @@ def main():
 		logger.error(f"Database initialization failed: {e}")
 		return
 
-	# 3) House processing
-	if include_house and filings:
-		new_filings = filter_new_filings(filings, existing_doc_ids, limit)
-		if new_filings:
-			house_transactions = process_filings_to_transactions(new_filings)
-			all_transactions.extend(house_transactions)
-		else:
-			logger.info("No new House filings to process.")
-
-	# 4) Senate processing
-	if include_senate and senate_scraper is not None and senate_llm is not None:
-		s_links = senate_scrape_links(max_pages=max_pages)
-		if s_links:
-			# Filter against existing doc_ids and apply limit remaining
-			s_links = [(d,u,m) for (d,u,m) in s_links if d and d not in existing_doc_ids]
-			remaining = max(0, limit - len(all_transactions)) if limit > 0 else 0
-			max_count = remaining if include_house and remaining > 0 else (limit if limit > 0 else 0)
-			senate_transactions = senate_links_to_transactions(s_links, headless=headless, max_count=max_count)
-			all_transactions.extend(senate_transactions)
-		else:
-			logger.info("No Senate links scraped.")
-
-	if not all_transactions:
+	# 2) Run House and Senate pipelines concurrently
+	budget = FilingBudget(limit)
+	# One PTR_LLM_RPM budget for every LLM request both pipelines make against the shared key
+	llm_limiter = ThreadRateLimiter(get_llm_rpm())
+	house_claimed = threading.Event()
+	if not include_house:
+		house_claimed.set()
+	# 3) Persist as rows arrive; dry-run collects them for a preview instead
+	all_transactions: List[Dict] = []
+	flusher = None if dry_run else TxnFlusher(db)
+	emit = all_transactions.append if flusher is None else flusher.add
+	total = 0
+	try:
+		with ThreadPoolExecutor(max_workers=2) as executor:
+			futures = []
+			if include_house:
+				futures.append(executor.submit(
+					run_house, year, headless, max_pages, existing_doc_ids, budget, house_claimed, args.save_scrape_json, emit,
+					llm_limiter
+				))
+			if include_senate:
+				futures.append(executor.submit(run_senate, headless, max_pages, existing_doc_ids, budget, house_claimed, emit, llm_limiter))
+			for future in futures:
+				try:
+					total += future.result()
+				except Exception as e:
+					logger.error(f"Pipeline branch failed: {e}")
+	finally:
+		stats = flusher.close() if flusher is not None else None
+
+	if not total:
 		logger.info("No transactions extracted - exiting.")
 		return
 
-	# 5) Persist combined
-	stats = persist_transactions(all_transactions, dry_run=dry_run)
-	logger.info(f"Pipeline complete. Summary: {json.dumps(stats, indent=2)}")
+	if flusher is None:
+		stats = preview_transactions(all_transactions)
+	logger.info(f"Pipeline complete. Summary: {dumps_pretty(stats)}")
 
 
 if __name__ == "__main__":
@@ -8,7 +8,7 @@ import time
 import json
 import os
 from datetime import datetime
-from typing import List, Dict, Set, Optional
+from typing import Iterator, List, Dict, Set, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -16,7 +16,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+
+from common.chromedriver_utils import get_chromedriver_path
 
 # Configure logging
 logging.basicConfig(
@@ -53,8 +54,8 @@ class HouseDisclosureScraper:
         # User agent to appear more like a real browser
         chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
-        # Use webdriver-manager to install and manage the correct ChromeDriver
-        service = Service(ChromeDriverManager().install())
+        # Resolved once per process (env override, CI system driver, or webdriver-manager)
+        service = Service(get_chromedriver_path())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         logger.info("Chrome WebDriver initialized")
         
@@ -229,30 +230,27 @@ class HouseDisclosureScraper:
             logger.error(f"Error extracting filings: {e}")
             return []
             
-    def navigate_pages(self, max_pages: Optional[int] = None, find_first_ptr: bool = False) -> List[Dict]:
+    def _iter_pages(self, max_pages: Optional[int] = None) -> Iterator[Tuple[int, List[Dict]]]:
         """
-        Navigate through all pages and extract PTR filings
+        Walk the paginated results table, yielding each page's PTR filings
         
         Args:
             max_pages: Maximum number of pages to process (None for all)
-            find_first_ptr: If True, stop after finding the first PTR filing.
             
-        Returns:
-            List of all PTR filings found
+        Yields:
+            (page number, list of filing dictionaries on that page)
         """
-        all_filings = []
         page_num = 1
         
         while True:
             if max_pages and page_num > max_pages:
                 logger.info(f"Reached maximum page limit ({max_pages})")
-                break
+                return
                 
             logger.info(f"Processing page {page_num}")
             
             # Extract filings from current page
-            page_filings = self.extract_ptr_filings_from_page()
-            all_filings.extend(page_filings)
+            yield page_num, self.extract_ptr_filings_from_page()
             
             # Try to go to next page
             try:
@@ -267,19 +265,36 @@ class HouseDisclosureScraper:
                 time.sleep(2)  # Wait for page to load
                 page_num += 1
                 
-                # If find_first_ptr is True, check if we found a PTR filing
-                if find_first_ptr and page_filings:
-                    for filing in page_filings:
-                        if filing['doc_id']:
-                            logger.info(f"Found PTR filing on page {page_num - 1}: {filing['doc_id']}")
-                            return all_filings # Return immediately if find_first_ptr is True
-                            
             except NoSuchElementException:
                 logger.info("No more pages to process")
-                break
+                return
             except Exception as e:
                 logger.error(f"Error navigating to next page: {e}")
-                break
+                return
+                
+    def navigate_pages(self, max_pages: Optional[int] = None, find_first_ptr: bool = False) -> List[Dict]:
+        """
+        Navigate through all pages and extract PTR filings
+        
+        Args:
+            max_pages: Maximum number of pages to process (None for all)
+            find_first_ptr: If True, stop after finding the first PTR filing.
+            
+        Returns:
+            List of all PTR filings found
+        """
+        all_filings = []
+        page_num = 0
+        
+        for page_num, page_filings in self._iter_pages(max_pages):
+            all_filings.extend(page_filings)
+            
+            # If find_first_ptr is True, check if we found a PTR filing
+            if find_first_ptr:
+                first = next((filing for filing in page_filings if filing['doc_id']), None)
+                if first:
+                    logger.info(f"Found PTR filing on page {page_num}: {first['doc_id']}")
+                    return all_filings # Return immediately if find_first_ptr is True
                 
         logger.info(f"Processed {page_num} pages, found {len(all_filings)} total PTR filings")
         return all_filings
@@ -327,6 +342,50 @@ class HouseDisclosureScraper:
             # Always close the driver
             self._close_driver()
             
+    def iter_ptr_filings(self, year: int = 2025, max_pages: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Scrape PTR filings for a given year, yielding each filing as soon as its page is parsed
+        
+        Lets callers start processing page 1 while later pages are still being scraped. Closing
+        the generator early (e.g. breaking out of the loop) stops the scrape and closes the driver.
+        
+        Args:
+            year: Year to scrape (default: 2025)
+            max_pages: Maximum number of pages to process (None for all)
+            
+        Yields:
+            PTR filing dictionaries
+        """
+        logger.info(f"Starting streaming scrape for year {year}")
+        self.scraped_filings = []
+        
+        try:
+            # Setup driver
+            self._setup_driver()
+            
+            # Navigate to search page
+            if not self.navigate_to_search():
+                raise Exception("Failed to navigate to search page")
+                
+            # Search for the specified year
+            if not self.search_by_year(year):
+                raise Exception(f"Failed to search for year {year}")
+                
+            # Sort by filing type
+            if not self.sort_by_filing_type():
+                logger.warning("Failed to sort by filing type, continuing anyway")
+                
+            for _, page_filings in self._iter_pages(max_pages):
+                self.scraped_filings.extend(page_filings)
+                yield from page_filings
+                
+        except Exception as e:
+            logger.error(f"Scraping failed: {e}")
+            
+        finally:
+            # Always close the driver
+            self._close_driver()
+            
     def save_scraped_filings(self, filepath: str = None):
         """
         Save scraped filings to a JSON file
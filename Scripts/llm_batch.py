@@ -0,0 +1,233 @@
+"""
+Async batch dispatcher for LLM calls.
+
+Fires per-document LLM calls concurrently while proactively staying under the
+provider's requests-per-minute limit, retrying transient failures (HTTP 429 and
+connection errors) with exponential backoff.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 3
+INITIAL_BACKOFF = 1.0
+
+# Outcome of the last tracked HTTP request made on the current thread
+_request_state = threading.local()
+
+
+class LLMUnavailableError(Exception):
+    """
+    Raised by a call function whose LLM request failed in a retryable way.
+
+    The HOR and Senate helpers swallow HTTP and network errors and return DOCUMENT_UNREADABLE,
+    so call functions check `call_tracking_failures` and raise this to get the backoff.
+    `partial` is returned instead of None if retries run out.
+    """
+
+    def __init__(self, message: str, partial: Any = None):
+        super().__init__(message)
+        self.partial = partial
+
+
+class AsyncRateLimiter:
+    """
+    Sliding-window limiter allowing at most `rpm` call starts in any 60 second window.
+    """
+
+    def __init__(self, rpm: int, period: float = 60.0):
+        """
+        Initialize rate limiter.
+
+        Args:
+            rpm: Number of calls allowed per period
+            period: Window length in seconds
+        """
+        self.rpm = max(1, rpm)
+        self.period = period
+        self.call_times = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a call slot is available, then record the call."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self.call_times and now - self.call_times[0] >= self.period:
+                    self.call_times.popleft()
+                if len(self.call_times) < self.rpm:
+                    break
+                sleep_time = self.period - (now - self.call_times[0])
+                logger.debug(f"LLM batch limiter: waiting {sleep_time:.2f}s")
+                await asyncio.sleep(sleep_time)
+            self.call_times.append(time.monotonic())
+
+
+class ThreadRateLimiter:
+    """
+    Thread-safe counterpart of AsyncRateLimiter for callers running on their own worker threads.
+    """
+
+    def __init__(self, rpm: int, period: float = 60.0):
+        """
+        Initialize rate limiter.
+
+        Args:
+            rpm: Number of calls allowed per period
+            period: Window length in seconds
+        """
+        self.rpm = max(1, rpm)
+        self.period = period
+        self.call_times = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call slot is available, then record the call."""
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                while self.call_times and now - self.call_times[0] >= self.period:
+                    self.call_times.popleft()
+                if len(self.call_times) < self.rpm:
+                    break
+                sleep_time = self.period - (now - self.call_times[0])
+                logger.debug(f"LLM limiter: waiting {sleep_time:.2f}s")
+                time.sleep(sleep_time)
+            self.call_times.append(time.monotonic())
+
+
+def track_request_failures(post_fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap an LLM helper module's HTTP POST function so failed requests can be told apart from model answers.
+
+    The HOR and Senate helpers return DOCUMENT_UNREADABLE both when the API call fails and when
+    the model itself reports an unreadable document; only the former is worth retrying.
+
+    Args:
+        post_fn: The helper's POST function (returns a requests.Response)
+
+    Returns:
+        Wrapped function recording the outcome for `call_tracking_failures`
+    """
+    if getattr(post_fn, '_tracks_failures', False):
+        return post_fn
+
+    @functools.wraps(post_fn)
+    def _tracked(*args, **kwargs):
+        _request_state.failed = True
+        response = post_fn(*args, **kwargs)
+        _request_state.failed = response.status_code != 200
+        return response
+
+    _tracked._tracks_failures = True
+    return _tracked
+
+
+def call_tracking_failures(fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+    """
+    Call an LLM helper, reporting whether the tracked HTTP request it made failed.
+
+    Returns:
+        (result, request_failed)
+    """
+    _request_state.failed = False
+    result = fn(*args, **kwargs)
+    return result, _request_state.failed
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Return True for rate-limit (HTTP 429), connection and LLM-unavailable failures."""
+    if isinstance(exc, (LLMUnavailableError, ConnectionError, TimeoutError)):
+        return True
+    if requests is not None:
+        if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        if isinstance(exc, requests.exceptions.HTTPError):
+            response = getattr(exc, 'response', None)
+            return response is not None and response.status_code == 429
+    return False
+
+
+async def run_llm_batch(items: List[Any], call_fn: Callable[[Any], Any], rpm: Optional[int], concurrency: int) -> List[Optional[Any]]:
+    """
+    Run `call_fn` over all items concurrently under an optional RPM cap and a concurrency bound.
+
+    `call_fn` is a blocking callable (e.g. an HTTP-backed LLM call); each invocation
+    runs on a worker thread so the event loop keeps dispatching.
+
+    Args:
+        items: Inputs, one per LLM call
+        call_fn: Blocking function taking a single item
+        rpm: Maximum calls started per minute, or None when `call_fn` acquires a shared ThreadRateLimiter itself
+        concurrency: Maximum calls in flight at once
+
+    Returns:
+        Results in the same order as `items`; None (or the error's partial result) where the call ultimately failed
+    """
+    if not items:
+        return []
+
+    concurrency = max(1, concurrency)
+    limiter = AsyncRateLimiter(rpm) if rpm is not None else None
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+        async def _run_one(index: int, item: Any) -> Optional[Any]:
+            backoff = INITIAL_BACKOFF
+            async with semaphore:
+                for attempt in range(MAX_RETRIES + 1):
+                    if limiter is not None:
+                        await limiter.acquire()
+                    try:
+                        return await loop.run_in_executor(executor, call_fn, item)
+                    except Exception as e:
+                        if attempt < MAX_RETRIES and _is_retryable(e):
+                            logger.warning(f"LLM batch item {index}: {e}; retrying in {backoff:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+                            await asyncio.sleep(backoff)
+                            backoff *= 2
+                            continue
+                        logger.error(f"LLM batch item {index} failed: {e}")
+                        return e.partial if isinstance(e, LLMUnavailableError) else None
+
+        return await asyncio.gather(*(_run_one(i, item) for i, item in enumerate(items)))
+
+
+def call_with_backoff(call_fn: Callable[[Any], Any], item: Any, label: str = "item") -> Optional[Any]:
+    """
+    Blocking counterpart of the batch retry policy for callers that manage their own threads.
+
+    Args:
+        call_fn: Blocking function taking a single item
+        item: Input for the call
+        label: Name used in log messages
+
+    Returns:
+        The call's result, or None (or the error's partial result) if it ultimately failed
+    """
+    backoff = INITIAL_BACKOFF
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return call_fn(item)
+        except Exception as e:
+            if attempt < MAX_RETRIES and _is_retryable(e):
+                logger.warning(f"LLM call {label}: {e}; retrying in {backoff:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+                time.sleep(backoff)
+                backoff *= 2
+                continue
+            logger.error(f"LLM call {label} failed: {e}")
+            return e.partial if isinstance(e, LLMUnavailableError) else None
@@ -0,0 +1,107 @@
+"""
+Persistent PTR result cache
+
+Maps the SHA1 of a filing's PDF bytes to the normalized transactions extracted from it,
+so re-runs (e.g. after a crash) and filings seen in multiple scrapes skip the LLM call.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ptr_cache.sqlite')
+
+
+class PTRCache:
+    """SQLite-backed index of processed PDFs keyed by content hash"""
+
+    def __init__(self, db_path: str = None):
+        """
+        Initialize the cache, creating the table if needed
+
+        Args:
+            db_path: SQLite file path (defaults to PTR_CACHE_PATH env or Scripts/ptr_cache.sqlite)
+        """
+        self.db_path = db_path or os.environ.get('PTR_CACHE_PATH') or DEFAULT_CACHE_PATH
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ptr_cache (
+                    sha1 TEXT PRIMARY KEY,
+                    doc_id TEXT,
+                    csv_json TEXT,
+                    ts REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_ptr_cache_doc_id ON ptr_cache(doc_id)')
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the cache safe to use from worker threads
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, sha1: str) -> Optional[Dict]:
+        """
+        Look up a cached entry by PDF hash
+
+        Args:
+            sha1: Hex SHA1 of the PDF bytes
+
+        Returns:
+            Row dict with sha1, doc_id, csv_json, ts or None if not cached
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute('SELECT * FROM ptr_cache WHERE sha1 = ?', (sha1,)).fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"PTR cache lookup failed for {sha1}: {e}")
+            return None
+
+    def get_by_doc_id(self, doc_id: str) -> Optional[Dict]:
+        """
+        Look up the most recent cached entry for a document ID
+
+        Args:
+            doc_id: Filing document ID
+
+        Returns:
+            Row dict or None if not cached
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT * FROM ptr_cache WHERE doc_id = ? ORDER BY ts DESC LIMIT 1', (doc_id,)
+                ).fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"PTR cache lookup failed for doc_id={doc_id}: {e}")
+            return None
+
+    def put(self, sha1: str, doc_id: str, csv_json: str):
+        """
+        Store (or replace) the extraction result for a PDF
+
+        Args:
+            sha1: Hex SHA1 of the PDF bytes
+            doc_id: Filing document ID
+            csv_json: JSON-encoded list of normalized transactions
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO ptr_cache (sha1, doc_id, csv_json, ts) VALUES (?, ?, ?, ?)',
+                    (sha1, doc_id, csv_json, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.error(f"PTR cache write failed for doc_id={doc_id}: {e}")
@@ -1,10 +1,24 @@
 import os
+import re
 import sys
+import json
+import shutil
+import hashlib
 import logging
+import multiprocessing
+import threading
+import time
 from io import BytesIO
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import requests
 import fitz
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ptr_cache import PTRCache
+from common.prompt_utils import generate_financial_prompt, get_prompt_generator
+from llm_batch import MAX_RETRIES, INITIAL_BACKOFF, ThreadRateLimiter, track_request_failures, call_tracking_failures
 
 # Reuse the robust HOR LLM parsing pipeline
 try:
@@ -14,45 +28,135 @@ try:
     from scanToTextLLM import (
         scan_with_openrouter as hor_scan_with_openrouter,
         parse_llm_transactions as hor_parse_llm_transactions,
+        api_key as hor_api_key,
+        OPENROUTER_API_URL as hor_openrouter_api_url,
     )
+    import scanToTextLLM as hor_llm
+    hor_llm.rate_limited_api_call = track_request_failures(hor_llm.rate_limited_api_call)
 except Exception:
+    hor_llm = None
     hor_scan_with_openrouter = None
     hor_parse_llm_transactions = None
+    hor_api_key = None
+    hor_openrouter_api_url = None
 
 
 logger = logging.getLogger(__name__)
 
+# Shared session so PDF downloads reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update({'User-Agent': 'PTR/1.0'})
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def _get_cache() -> PTRCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = PTRCache()
+        return _CACHE
+
+
+# Blank and comment lines in LLM CSV output, dropped before parsing
+_BLANK_LINE = re.compile(r'^\s*(#|$)')
+
+# Documents per row-marshaled LLM request, and the combined text budget for one request
+BATCH_SIZE = 4
+BATCH_MAX_CHARS = 24000
+BATCH_MODEL = "google/gemini-2.0-flash-001"
+
+# Page counts at or below this are extracted serially to avoid process pool overhead
+SERIAL_PAGE_THRESHOLD = 4
+
+_EXTRACT_POOL = None
+_EXTRACT_POOL_LOCK = threading.Lock()
+
+# Plain text without ligature/whitespace preservation; the LLM tolerates the noisier output
+TEXT_EXTRACT_FLAGS = fitz.TEXT_MEDIABOX_CLIP
 
-def _extract_pdf_text(pdf_bytes: bytes) -> str:
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """
+    Shared page-extraction pool, created on first use.
+
+    Callers run on many threads at once, so one pool bounds the worker count to the CPU count,
+    and "spawn" keeps children from inheriting locks held by other threads at fork time.
+    """
+    global _EXTRACT_POOL
+    with _EXTRACT_POOL_LOCK:
+        if _EXTRACT_POOL is None:
+            _EXTRACT_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _EXTRACT_POOL
+
+
+def _extract_range(pdf_stream, start: int, end: int) -> str:
+    """Extract text for pages [start, end). Top-level so it can run in a worker process."""
+    doc = fitz.open(stream=pdf_stream, filetype="pdf")
     try:
-        doc = fitz.open("pdf", pdf_bytes)
         text = []
-        for i in range(len(doc)):
-            page = doc[i]
-            page_text = page.get_text()
+        for i in range(start, end):
+            page_text = doc[i].get_text("text", flags=TEXT_EXTRACT_FLAGS)
             if page_text:
                 text.append(page_text)
         return "\n".join(text)
+    finally:
+        doc.close()
+
+
+def _extract_pdf_text(pdf_stream: BytesIO) -> str:
+    try:
+        with fitz.open(stream=pdf_stream, filetype="pdf") as doc:
+            n = doc.page_count
+        workers = min(os.cpu_count() or 1, n)
+        if n <= SERIAL_PAGE_THRESHOLD or workers <= 1:
+            return _extract_range(pdf_stream, 0, n)
+
+        chunk = -(-n // workers)
+        ranges = [(start, min(start + chunk, n)) for start in range(0, n, chunk)]
+        pdf_bytes = pdf_stream.getvalue()
+        executor = _get_extract_pool()
+        futures = [executor.submit(_extract_range, pdf_bytes, start, end) for start, end in ranges]
+        parts = [f.result() for f in futures]
+        return "\n".join(p for p in parts if p)
     except Exception as e:
         logger.error(f"PDF text extraction failed: {e}")
         return ""
 
 
-def _download(pdf_url: str) -> bytes:
-    response = requests.get(pdf_url, timeout=60)
-    response.raise_for_status()
-    return response.content
+def _download(pdf_url: str) -> BytesIO:
+    """Stream the PDF into a single in-memory buffer (no intermediate `.content` copy)."""
+    bio = BytesIO()
+    with _SESSION.get(pdf_url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, bio)
+    bio.seek(0)
+    return bio
 
 
 def _normalize_transactions(llm_csv_text: str, member_data: Dict) -> List[Dict]:
     if hor_parse_llm_transactions is None:
         logger.warning("parse_llm_transactions not available; returning empty transactions")
         return []
-    parsed = hor_parse_llm_transactions(llm_csv_text, member_data)
+    if not llm_csv_text:
+        return []
+    cleaned = "\n".join(line for line in llm_csv_text.splitlines() if not _BLANK_LINE.match(line))
+    if len(cleaned) < 8:
+        return []
+    parsed = hor_parse_llm_transactions(cleaned, member_data)
     # Map to Supabase schema fields expected downstream
-    normalized: List[Dict] = []
-    for t in parsed:
-        normalized.append({
+    return [
+        {
             "transaction_date": t.get("transaction_date_str"),
             "ticker": t.get("ticker"),
             "asset_name": t.get("company_name"),
@@ -61,34 +165,35 @@ def _normalize_transactions(llm_csv_text: str, member_data: Dict) -> List[Dict]:
             "amount_high": t.get("amount_high"),
             "owner": t.get("owner_code"),
             "comment": t.get("raw_llm_line", "")
-        })
-    return normalized
+        }
+        for t in parsed
+    ]
 
 
-def process_ptr_pdf(pdf_url: str, doc_id: str) -> Dict:
-    """
-    Download a House PTR PDF, extract text, run LLM to produce CSV-like rows, normalize for DB.
-    Returns { "transactions": [ ... ] }
-    """
-    logger.info(f"Processing PDF for doc_id={doc_id}")
+def _scan_downloaded(pdf_stream: BytesIO, pdf_hash: str, doc_id: str, limiter: Optional[ThreadRateLimiter] = None) -> Dict:
+    """Run the single-document HOR scanner on an already downloaded PDF, caching the result."""
+    cache = _get_cache()
 
-    # If HOR LLM scanner is available, use it directly (it handles PDF internally)
+    # If HOR LLM scanner is available, hand it the downloaded PDF
     if hor_scan_with_openrouter is not None and hor_parse_llm_transactions is not None:
         try:
-            llm_csv = hor_scan_with_openrouter(pdf_url, {"DocID": doc_id})
+            if limiter is not None:
+                limiter.acquire()
+            llm_csv, request_failed = call_tracking_failures(hor_scan_with_openrouter, pdf_stream, {"DocID": doc_id})
             transactions = _normalize_transactions(llm_csv, {"DocID": doc_id})
+            # API failures also come back as DOCUMENT_UNREADABLE; leave only those uncached for a retry.
+            # A model-issued DOCUMENT_UNREADABLE or an invalid PDF is final and cached like any answer.
+            if request_failed:
+                return {"transactions": transactions, "llm_failed": True}
+            if hor_api_key:
+                cache.put(pdf_hash, doc_id, json.dumps(transactions))
             return {"transactions": transactions}
         except Exception as e:
             logger.warning(f"HOR scan_with_openrouter failed, falling back to local text extraction: {e}")
+            pdf_stream.seek(0)
 
-    # Fallback: download PDF and extract text locally, then feed to HOR parser via same interface
-    try:
-        pdf_bytes = _download(pdf_url)
-    except Exception as e:
-        logger.error(f"Failed to download PDF: {e}")
-        return {"transactions": []}
-
-    text = _extract_pdf_text(pdf_bytes)
+    # Fallback: extract text locally, then feed to HOR parser via same interface
+    text = _extract_pdf_text(pdf_stream)
     if not text.strip() or hor_parse_llm_transactions is None:
         return {"transactions": []}
 
@@ -96,3 +201,211 @@ def process_ptr_pdf(pdf_url: str, doc_id: str) -> Dict:
     # In absence of API call, we cannot generate CSV; so we return empty.
     logger.info("No LLM CSV available without API. Returning no transactions.")
     return {"transactions": []}
+
+
+def process_ptr_pdf(pdf_url: str, doc_id: str) -> Dict:
+    """
+    Download a House PTR PDF, extract text, run LLM to produce CSV-like rows, normalize for DB.
+    Results are cached by PDF hash so previously processed documents skip the LLM.
+    Returns { "transactions": [ ... ] }
+    """
+    logger.info(f"Processing PDF for doc_id={doc_id}")
+    cache = _get_cache()
+
+    # Already processed in an earlier run: skip the download entirely
+    cached = cache.get_by_doc_id(doc_id)
+    if cached:
+        logger.info(f"doc_id={doc_id}: using cached transactions")
+        return {"transactions": json.loads(cached["csv_json"])}
+
+    try:
+        pdf_stream = _download(pdf_url)
+    except Exception as e:
+        logger.error(f"Failed to download PDF: {e}")
+        return {"transactions": []}
+
+    pdf_hash = hashlib.sha1(pdf_stream.getvalue()).hexdigest()
+    cached = cache.get(pdf_hash)
+    if cached:
+        logger.info(f"doc_id={doc_id}: PDF matches cached doc_id={cached['doc_id']}, skipping LLM")
+        return {"transactions": json.loads(cached["csv_json"])}
+
+    return _scan_downloaded(pdf_stream, pdf_hash, doc_id)
+
+
+def _split_batched_csv(llm_output: str, doc_ids: List[str]) -> Dict[str, str]:
+    """
+    Split a multi-document CSV (doc_id as first column) into per-document CSV text.
+
+    Documents without any prefixed rows are left out of the result, so callers can tell
+    "the model returned nothing for this filing" apart from a real answer.
+    """
+    lines_by_doc: Dict[str, List[str]] = {doc_id: [] for doc_id in doc_ids}
+    for line in llm_output.splitlines():
+        line = line.strip()
+        if not line or line.startswith("```"):
+            continue
+        doc_id, _, rest = line.partition(",")
+        doc_id = doc_id.strip().strip('"')
+        if doc_id in lines_by_doc and rest.strip():
+            lines_by_doc[doc_id].append(rest.strip())
+        else:
+            logger.debug(f"Batched LLM output line without a known doc_id: {line}")
+    return {doc_id: "\n".join(lines) for doc_id, lines in lines_by_doc.items() if lines}
+
+
+def hor_scan_with_openrouter_batched(items: List[Tuple[str, str, str]],
+                                     limiter: Optional[ThreadRateLimiter] = None) -> Optional[Dict[str, str]]:
+    """
+    Extract transactions for several documents with a single OpenRouter request.
+
+    Args:
+        items: (pdf_url, doc_id, text) tuples whose combined text fits BATCH_MAX_CHARS
+        limiter: Optional shared limiter acquired before every request
+
+    Returns:
+        Mapping of doc_id to that document's CSV text (HOR 6-column format) for documents the
+        model returned rows for, or None if the request failed and callers should fall back to
+        per-document scans.
+    """
+    if not hor_api_key or not hor_openrouter_api_url or hor_llm is None:
+        return None
+    # The batched rules live in the Jinja2 template; the plain-text fallback prompt is single-document only
+    if get_prompt_generator().env is None:
+        return None
+
+    doc_ids = [doc_id for _, doc_id, _ in items]
+    combined_text = "".join(f"=== DOC {doc_id} ===\n{text}\n" for _, doc_id, text in items)
+    system_instruction, user_prompt = generate_financial_prompt(combined_text, document_source="house", batched=True)
+
+    payload = {
+        "model": BATCH_MODEL,
+        "messages": [
+            {"role": "system", "content": system_instruction},
+            {"role": "user", "content": user_prompt}
+        ],
+        "max_tokens": 8192,
+        "temperature": 0.1,
+        "provider": {
+            "only": ["Google AI Studio"]
+        }
+    }
+    headers = {
+        "Authorization": f"Bearer {hor_api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:3000",
+        "X-Title": "HOR Committee Financial Disclosures Scraper"
+    }
+
+    logger.info(f"Sending batched OpenRouter request for {len(items)} documents: {', '.join(doc_ids)}")
+    backoff = INITIAL_BACKOFF
+    try:
+        for attempt in range(MAX_RETRIES + 1):
+            if limiter is not None:
+                limiter.acquire()
+            # Same rate-limit bucket as the single-document HOR scans
+            response = hor_llm.rate_limited_api_call(hor_openrouter_api_url, headers=headers, json=payload, timeout=120)
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                break
+            # Retry only the POST; the group's downloads and extracted text stay in hand
+            logger.warning(f"Batched OpenRouter request rate limited; retrying in {backoff:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+            time.sleep(backoff)
+            backoff *= 2
+        if response.status_code != 200:
+            logger.error(f"Batched OpenRouter request failed: {response.status_code} - {response.text}")
+            return None
+        choices = response.json().get("choices") or []
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error(f"Batched OpenRouter request failed: {e}")
+        return None
+    if not choices:
+        logger.error("Batched OpenRouter request returned no choices")
+        return None
+    choice = choices[0]
+    if choice.get("finish_reason") == "length":
+        logger.warning("Batched OpenRouter response was cut off due to length; falling back to per-document scans")
+        return None
+
+    llm_output = (choice.get("message") or {}).get("content") or ""
+    if llm_output.strip() == "DOCUMENT_UNREADABLE":
+        return None
+    return _split_batched_csv(llm_output, doc_ids)
+
+
+def process_ptr_pdf_batch(filings: List[Tuple[str, str]], limiter: Optional[ThreadRateLimiter] = None) -> Dict[str, Dict]:
+    """
+    Process several House PTR PDFs, sharing LLM requests between documents where possible.
+
+    Args:
+        filings: (pdf_url, doc_id) tuples, typically BATCH_SIZE of them
+        limiter: Optional shared limiter acquired before every LLM request
+
+    Returns:
+        Mapping of doc_id to { "transactions": [ ... ] }; entries also carry "llm_failed": True
+        when the LLM request itself failed (left uncached so a retry rescans them)
+    """
+    cache = _get_cache()
+    results: Dict[str, Dict] = {}
+    pending: List[Tuple[str, str, BytesIO, str, str]] = []
+
+    for pdf_url, doc_id in filings:
+        cached = cache.get_by_doc_id(doc_id)
+        if cached:
+            logger.info(f"doc_id={doc_id}: using cached transactions")
+            results[doc_id] = {"transactions": json.loads(cached["csv_json"])}
+            continue
+        try:
+            pdf_stream = _download(pdf_url)
+        except Exception as e:
+            logger.error(f"Failed to download PDF for doc_id={doc_id}: {e}")
+            results[doc_id] = {"transactions": []}
+            continue
+        pdf_hash = hashlib.sha1(pdf_stream.getvalue()).hexdigest()
+        cached = cache.get(pdf_hash)
+        if cached:
+            logger.info(f"doc_id={doc_id}: PDF matches cached doc_id={cached['doc_id']}, skipping LLM")
+            results[doc_id] = {"transactions": json.loads(cached["csv_json"])}
+            continue
+        text = _extract_pdf_text(pdf_stream)
+        pdf_stream.seek(0)
+        pending.append((pdf_url, doc_id, pdf_stream, pdf_hash, text))
+
+    # Documents without text or too large to share a request go through the single-document scanner
+    batchable = []
+    singles = []
+    for p in pending:
+        (batchable if p[4].strip() and len(p[4]) <= BATCH_MAX_CHARS else singles).append(p)
+
+    groups: List[List[Tuple[str, str, BytesIO, str, str]]] = []
+    for p in batchable:
+        if groups and len(groups[-1]) < BATCH_SIZE and sum(len(g[4]) for g in groups[-1]) + len(p[4]) <= BATCH_MAX_CHARS:
+            groups[-1].append(p)
+        else:
+            groups.append([p])
+
+    for group in groups:
+        if len(group) == 1:
+            singles.extend(group)
+            continue
+        csv_by_doc = hor_scan_with_openrouter_batched([(url, doc_id, text) for url, doc_id, _, _, text in group], limiter)
+        if csv_by_doc is None:
+            singles.extend(group)
+            continue
+        for p in group:
+            _, doc_id, _, pdf_hash, _ = p
+            csv_text = csv_by_doc.get(doc_id)
+            transactions = _normalize_transactions(csv_text, {"DocID": doc_id}) if csv_text else []
+            if not transactions:
+                # A filing missing from the shared answer is rescanned alone instead of cached as empty
+                logger.info(f"doc_id={doc_id}: no rows in batched response; rescanning individually")
+                singles.append(p)
+                continue
+            cache.put(pdf_hash, doc_id, json.dumps(transactions))
+            results[doc_id] = {"transactions": transactions}
+            logger.info(f"doc_id={doc_id}: extracted {len(transactions)} transaction(s) via batched request")
+
+    for _, doc_id, pdf_stream, pdf_hash, _ in singles:
+        logger.info(f"Processing PDF for doc_id={doc_id}")
+        results[doc_id] = _scan_downloaded(pdf_stream, pdf_hash, doc_id, limiter)
+
+    return results
@@ -28,6 +28,9 @@ SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 if not SUPABASE_URL or not SUPABASE_KEY:
     logger.error("Supabase credentials not found in environment variables")
 
+# Values per `.in_()` filter; the filter travels in the GET query string, so keep URLs short
+BULK_SELECT_CHUNK_SIZE = 100
+
 class SupabaseDBProcessor:
     """Handles all database operations with Supabase"""
     
@@ -203,6 +206,30 @@ class SupabaseDBProcessor:
             
         return None
         
+    @staticmethod
+    def _build_transaction_record(transaction_data: Dict, filing_id: int, asset_id: int) -> Dict:
+        """Map a pipeline transaction dict to a Transactions row"""
+        # Map owner to owner_code
+        owner_map = {
+            'Self': 'S',
+            'Spouse': 'SP',
+            'Joint': 'JT',
+            'Dependent': 'DC',
+            'Child': 'DC'
+        }
+        owner_code = owner_map.get(transaction_data.get('owner', ''), transaction_data.get('owner', ''))
+        
+        return {
+            'filing_id': filing_id,
+            'asset_id': asset_id,
+            'owner_code': owner_code,
+            'transaction_type': transaction_data.get('transaction_type'),
+            'transaction_date': transaction_data.get('transaction_date'),
+            'amount_range_low': transaction_data.get('amount_low'),
+            'amount_range_high': transaction_data.get('amount_high'),
+            'raw_llm_csv_line': transaction_data.get('comment', '')
+        }
+        
     def create_transaction(self, transaction_data: Dict, filing_id: int, asset_id: int) -> bool:
         """
         Create a new transaction record
@@ -216,27 +243,7 @@ class SupabaseDBProcessor:
             True if successful, False otherwise
         """
         try:
-            # Map owner to owner_code
-            owner_map = {
-                'Self': 'S',
-                'Spouse': 'SP',
-                'Joint': 'JT',
-                'Dependent': 'DC',
-                'Child': 'DC'
-            }
-            owner_code = owner_map.get(transaction_data.get('owner', ''), transaction_data.get('owner', ''))
-            
-            # Create transaction record
-            new_transaction = {
-                'filing_id': filing_id,
-                'asset_id': asset_id,
-                'owner_code': owner_code,
-                'transaction_type': transaction_data.get('transaction_type'),
-                'transaction_date': transaction_data.get('transaction_date'),
-                'amount_range_low': transaction_data.get('amount_low'),
-                'amount_range_high': transaction_data.get('amount_high'),
-                'raw_llm_csv_line': transaction_data.get('comment', '')
-            }
+            new_transaction = self._build_transaction_record(transaction_data, filing_id, asset_id)
             
             response = self.supabase.table('Transactions').insert(new_transaction).execute()
             
@@ -339,6 +346,251 @@ class SupabaseDBProcessor:
         logger.info(f"Batch processing complete: {stats}")
         return stats
         
+    def _select_in(self, table: str, columns: str, column: str, values: List) -> List[Dict]:
+        """
+        Select rows whose `column` is in `values`, batching the filter to bound URL length
+        
+        Args:
+            table: Table name
+            columns: Columns to select
+            column: Column to filter on
+            values: Values to match
+            
+        Returns:
+            List of matching rows
+        """
+        rows = []
+        for start in range(0, len(values), BULK_SELECT_CHUNK_SIZE):
+            response = self.supabase.table(table).select(columns).in_(column, values[start:start + BULK_SELECT_CHUNK_SIZE]).execute()
+            rows.extend(response.data or [])
+        return rows
+        
+    def _bulk_resolve_members(self, members: Dict[str, Optional[str]], stats: Dict[str, int]):
+        """
+        Resolve member IDs for many names with batched selects and one upsert
+        
+        Names the upsert skips or fails on are resolved one at a time with get_or_create_member.
+        
+        Args:
+            members: Mapping of member name to office
+            stats: Stats dictionary updated in place
+        """
+        names = [name for name in members if name and name not in self.member_cache]
+        if not names:
+            return
+            
+        for row in self._select_in('Members', 'member_id, name', 'name', names):
+            self.member_cache[row['name']] = row['member_id']
+            
+        new_members = []
+        for name in names:
+            if name in self.member_cache:
+                continue
+            office = members[name]
+            chamber = 'House' if office and 'House' in office else 'Senate' if office and 'Senate' in office else None
+            new_members.append({'name': name, 'chamber': chamber})
+            
+        if new_members:
+            try:
+                response = self.supabase.table('Members').upsert(new_members, on_conflict='name', ignore_duplicates=True).execute()
+                created = response.data or []
+            except Exception as e:
+                logger.warning(f"Bulk member insert failed, falling back to per-row: {e}")
+                created = []
+            for row in created:
+                self.member_cache[row['name']] = row['member_id']
+            stats['members_created'] += len(created)
+            logger.info(f"Created {len(created)} new member(s)")
+            for member in new_members:
+                if member['name'] not in self.member_cache:
+                    self.get_or_create_member(member['name'], members[member['name']])
+            
+    def _bulk_resolve_assets(self, assets: Set[Tuple[str, str]], stats: Dict[str, int]):
+        """
+        Resolve asset IDs for many (ticker, company_name) pairs with batched selects and one upsert
+        
+        Pairs the upsert skips or fails on are resolved one at a time with get_or_create_asset.
+        
+        Args:
+            assets: Set of (ticker, company_name) pairs
+            stats: Stats dictionary updated in place
+        """
+        pending = {(ticker, company) for ticker, company in assets if f"{ticker}:{company}" not in self.asset_cache}
+        if not pending:
+            return
+            
+        company_names = list({company for _, company in pending})
+        for row in self._select_in('Assets', 'asset_id, ticker, company_name', 'company_name', company_names):
+            cache_key = f"{row['ticker'] or ''}:{row['company_name']}"
+            self.asset_cache.setdefault(cache_key, row['asset_id'])
+            
+        new_assets = [
+            {
+                'ticker': ticker,
+                'ticker_clean': ticker.upper().strip(),
+                'company_name': company,
+                'company_clean': company.strip()
+            }
+            for ticker, company in pending
+            if f"{ticker}:{company}" not in self.asset_cache
+        ]
+        
+        if new_assets:
+            try:
+                response = self.supabase.table('Assets').upsert(
+                    new_assets, on_conflict='company_name,ticker', ignore_duplicates=True
+                ).execute()
+                created = response.data or []
+            except Exception as e:
+                logger.warning(f"Bulk asset insert failed, falling back to per-row: {e}")
+                created = []
+            for row in created:
+                self.asset_cache[f"{row['ticker'] or ''}:{row['company_name']}"] = row['asset_id']
+            stats['assets_created'] += len(created)
+            logger.info(f"Created {len(created)} new asset(s)")
+            for asset in new_assets:
+                if f"{asset['ticker']}:{asset['company_name']}" not in self.asset_cache:
+                    self.get_or_create_asset(asset['ticker'], asset['company_name'])
+            
+    def _bulk_resolve_filings(self, filings_map: Dict[str, Dict], stats: Dict[str, int]) -> Dict[str, int]:
+        """
+        Resolve filing IDs for many doc_ids with batched selects and one upsert
+        
+        Filings the upsert skips or fails on are resolved one at a time with create_filing.
+        
+        Args:
+            filings_map: Mapping of doc_id to filing metadata (member_name, pdf_url)
+            stats: Stats dictionary updated in place
+            
+        Returns:
+            Mapping of doc_id to filing_id
+        """
+        filing_ids = {}
+        doc_ids = [doc_id for doc_id in filings_map if doc_id]
+        if not doc_ids:
+            return filing_ids
+            
+        for row in self._select_in('Filings', 'filing_id, doc_id', 'doc_id', doc_ids):
+            filing_ids[row['doc_id']] = row['filing_id']
+            
+        new_filings = []
+        for doc_id in doc_ids:
+            if doc_id in filing_ids:
+                continue
+            filing_data = filings_map[doc_id]
+            member_id = self.member_cache.get(filing_data['member_name'])
+            if not member_id:
+                logger.error(f"Failed to get/create member for {filing_data['member_name']}")
+                stats['errors'] += 1
+                continue
+            new_filings.append({
+                'doc_id': doc_id,
+                'member_id': member_id,
+                'url': filing_data['pdf_url'],
+                'verified': True  # Mark as verified since we're processing it
+            })
+            
+        if new_filings:
+            try:
+                response = self.supabase.table('Filings').upsert(new_filings, on_conflict='doc_id', ignore_duplicates=True).execute()
+                created = response.data or []
+            except Exception as e:
+                logger.warning(f"Bulk filing insert failed, falling back to per-row: {e}")
+                created = []
+            for row in created:
+                filing_ids[row['doc_id']] = row['filing_id']
+            stats['filings_created'] += len(created)
+            logger.info(f"Created {len(created)} new filing(s)")
+            for filing in new_filings:
+                if filing['doc_id'] not in filing_ids:
+                    filing_id = self.create_filing(filing['doc_id'], filing['member_id'], filing['url'])
+                    if filing_id:
+                        filing_ids[filing['doc_id']] = filing_id
+            
+        return filing_ids
+        
+    def upsert_bulk(self, transactions: List[Dict], persisted_doc_ids: Optional[Set[str]] = None) -> Dict[str, int]:
+        """
+        Upload a chunk of transactions using one request per table instead of one per row
+        
+        Members, assets and filings are de-duplicated and resolved in bulk (falling back to the
+        per-row helpers for any the bulk upsert cannot create), then all transaction rows are
+        inserted with a single call, retried row by row if that call fails.
+        
+        Args:
+            transactions: List of transaction dictionaries (callers should keep chunks to a few hundred rows)
+            persisted_doc_ids: Optional set updated in place with the doc_ids that had rows inserted
+            
+        Returns:
+            Dictionary with counts of processed items
+        """
+        stats = {
+            'members_created': 0,
+            'assets_created': 0,
+            'filings_created': 0,
+            'transactions_created': 0,
+            'errors': 0
+        }
+        if not transactions:
+            return stats
+            
+        filings_map = {}
+        members = {}
+        assets = set()
+        for transaction in transactions:
+            doc_id = transaction.get('doc_id')
+            if doc_id not in filings_map:
+                filings_map[doc_id] = {
+                    'member_name': transaction.get('member_name'),
+                    'pdf_url': transaction.get('pdf_url')
+                }
+            members.setdefault(transaction.get('member_name'), transaction.get('office'))
+            assets.add((transaction.get('ticker') or '', transaction.get('asset_name') or ''))
+            
+        try:
+            self._bulk_resolve_members(members, stats)
+            self._bulk_resolve_assets(assets, stats)
+            filing_ids = self._bulk_resolve_filings(filings_map, stats)
+        except Exception as e:
+            logger.error(f"Error resolving members/assets/filings in bulk: {e}")
+            stats['errors'] += len(transactions)
+            return stats
+            
+        resolved = []
+        for transaction in transactions:
+            filing_id = filing_ids.get(transaction.get('doc_id'))
+            asset_id = self.asset_cache.get(f"{transaction.get('ticker') or ''}:{transaction.get('asset_name') or ''}")
+            if not filing_id or not asset_id:
+                logger.error(f"Missing filing/asset for {transaction.get('doc_id')} - {transaction.get('ticker')}")
+                stats['errors'] += 1
+                continue
+            resolved.append((transaction, filing_id, asset_id))
+            
+        if resolved:
+            landed_filing_ids = []
+            try:
+                records = [self._build_transaction_record(t, filing_id, asset_id) for t, filing_id, asset_id in resolved]
+                response = self.supabase.table('Transactions').insert(records).execute()
+                landed_filing_ids = [row.get('filing_id') for row in response.data or []]
+            except Exception as e:
+                # One bad row fails the whole insert; retry row by row so only that row is lost
+                logger.warning(f"Bulk insert of {len(resolved)} transactions failed, falling back to per-row: {e}")
+                for transaction, filing_id, asset_id in resolved:
+                    if self.create_transaction(transaction, filing_id, asset_id):
+                        landed_filing_ids.append(filing_id)
+                    else:
+                        stats['errors'] += 1
+            stats['transactions_created'] += len(landed_filing_ids)
+            if persisted_doc_ids is not None:
+                doc_ids_by_filing = {filing_id: doc_id for doc_id, filing_id in filing_ids.items()}
+                persisted_doc_ids.update(
+                    doc_ids_by_filing[filing_id] for filing_id in landed_filing_ids
+                    if filing_id in doc_ids_by_filing
+                )
+                
+        logger.info(f"Bulk upload complete: {stats}")
+        return stats
+        
     def get_recent_transactions(self, limit: int = 10) -> List[Dict]:
         """
         Get recent transactions from the database